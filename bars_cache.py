@@ -0,0 +1,154 @@
+"""On-disk Parquet cache for daily bars.
+
+Completed daily candles never change, so repeat runs only need the sessions
+printed since the last cached bar. Files live under ``data/bars/<A>/<TICKER>.parquet``
+(sharded by first letter). Caching is skipped entirely when pyarrow is not
+installed.
+"""
+from __future__ import annotations
+
+from datetime import datetime, time, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, Optional
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  # type: ignore
+except ImportError:  # pragma: no cover - parquet support is optional
+    HAVE_PARQUET = False
+else:
+    HAVE_PARQUET = True
+
+
+ROOT = Path(__file__).resolve().parent
+CACHE_DIR = ROOT / "data" / "bars"
+BAR_COLUMNS = ["open", "high", "low", "close", "volume"]
+MARKET_TZ = ZoneInfo("America/New_York")
+MARKET_CLOSE = time(16, 0)
+
+Fetcher = Callable[[str, datetime], pd.DataFrame]
+
+
+def cache_path(ticker: str) -> Path:
+    symbol = ticker.upper()
+    return CACHE_DIR / symbol[:1] / f"{symbol}.parquet"
+
+
+def latest_closed_session(now: Optional[datetime] = None) -> pd.Timestamp:
+    """Date of the most recent session whose daily bar should be final."""
+    local = (now or datetime.now(timezone.utc)).astimezone(MARKET_TZ)
+    day = pd.Timestamp(local.date())
+    if day.weekday() >= 5 or local.time() < MARKET_CLOSE:
+        day = day - pd.offsets.BDay(1)
+    return day
+
+
+def _naive_utc(df: pd.DataFrame) -> pd.DataFrame:
+    if isinstance(df.index, pd.DatetimeIndex) and df.index.tz is not None:
+        df = df.copy()
+        df.index = df.index.tz_convert(None)
+    return df
+
+
+def read_cached_bars(ticker: str) -> pd.DataFrame:
+    path = cache_path(ticker)
+    if not HAVE_PARQUET or not path.exists():
+        return pd.DataFrame()
+    try:
+        return pd.read_parquet(path, engine="pyarrow", columns=BAR_COLUMNS)
+    except Exception:
+        return pd.DataFrame()
+
+
+def write_cached_bars(ticker: str, df: pd.DataFrame, session: pd.Timestamp) -> None:
+    """Persist bars up to ``session``; a still-forming bar is never cached."""
+    df = df[df.index.normalize() <= session]
+    if not HAVE_PARQUET or df.empty:
+        return
+    path = cache_path(ticker)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        df[[col for col in BAR_COLUMNS if col in df.columns]].to_parquet(path, engine="pyarrow")
+    except Exception:
+        pass
+
+
+def append_snapshot_bar(df: pd.DataFrame, snapshot: Optional[Dict[str, object]]) -> pd.DataFrame:
+    """Append the snapshot's session bar when the history lags behind it."""
+    if not snapshot or df.empty or df.attrs.get("source") == "synthetic":
+        return df
+    last = df.index[-1]
+    session = pd.Timestamp(snapshot["date"])
+    if last.tzinfo is not None:
+        session = session.tz_localize(last.tzinfo)
+    if session.date() <= last.date():
+        return df
+    row = pd.DataFrame(
+        {col: [snapshot[col]] for col in BAR_COLUMNS if col in df.columns},
+        index=pd.DatetimeIndex([session], name=df.index.name),
+    )
+    out = pd.concat([df, row])
+    out.attrs = dict(df.attrs)
+    return out
+
+
+def get_bars_cached(
+    ticker: str,
+    start: datetime,
+    fetch: Fetcher,
+    fetch_since: Optional[Fetcher],
+    snapshot: Optional[Dict[str, object]] = None,
+    now: Optional[datetime] = None,
+) -> pd.DataFrame:
+    """Return bars from ``start`` using the Parquet cache where possible.
+
+    ``fetch`` downloads full history (the provider chain). ``fetch_since``
+    loads the slice after the last cached bar and should raise when the
+    provider cannot answer; an empty result means no sessions were printed
+    (a market holiday) and the cached frame is returned as is. Without a
+    ``fetch_since`` a lagging cache falls back to ``fetch``. Synthetic bars are
+    never written to the cache.
+    """
+    start_ts = pd.Timestamp(start)
+    if start_ts.tzinfo is not None:
+        start_ts = start_ts.tz_convert(None)
+    start_ts = start_ts.normalize()
+    session = latest_closed_session(now)
+
+    cached = _naive_utc(read_cached_bars(ticker))
+    if not cached.empty and cached.index[0].normalize() <= start_ts + pd.offsets.BDay(1):
+        cached = cached.sort_index()
+        cached.attrs["source"] = "cache"
+        last = cached.index[-1].normalize()
+        if last < session:
+            if (
+                snapshot
+                and pd.Timestamp(snapshot["date"]) == session
+                and last >= session - pd.offsets.BDay(1)
+            ):
+                cached = append_snapshot_bar(cached, snapshot)
+                write_cached_bars(ticker, cached, session)
+            elif fetch_since is not None:
+                since = (last + timedelta(days=1)).to_pydatetime().replace(tzinfo=timezone.utc)
+                try:
+                    fresh = _naive_utc(fetch_since(ticker, since))
+                except Exception:
+                    cached = pd.DataFrame()
+                else:
+                    if not fresh.empty:
+                        merged = pd.concat([cached, fresh[[c for c in BAR_COLUMNS if c in fresh.columns]]])
+                        merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+                        merged.attrs["source"] = "cache"
+                        write_cached_bars(ticker, merged, session)
+                        cached = merged
+            else:
+                cached = pd.DataFrame()
+        if not cached.empty:
+            return cached[cached.index >= start_ts]
+
+    df = fetch(ticker, start)
+    if not df.empty and df.attrs.get("source") != "synthetic":
+        write_cached_bars(ticker, _naive_utc(df).sort_index(), session)
+    return df
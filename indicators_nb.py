@@ -0,0 +1,140 @@
+"""Numba kernels for the per-ticker indicator pipeline.
+
+pandas' ``ewm``/``rolling`` carry a lot of per-call overhead that dominates on
+the ~250-row series the screener works with. These kernels operate on raw
+float64 arrays and mirror the pandas semantics the strategy relies on:
+
+* ``ema_nb``  == ``Series.ewm(alpha=alpha, adjust=False).mean()``
+* ``sma_nb``  == ``Series.rolling(window).mean()``
+* ``atr_nb``  == simple-average true range (first bar uses high - low)
+
+including their NaN handling, so one missing bar only affects the windows
+that contain it.
+
+numba is optional. Without it ``ema_nb`` runs as plain Python, while
+``sma_nb``/``atr_nb`` switch to the vectorized NumPy forms below (cumsum
+rolling mean, ``np.fmax.reduce`` true range), which beat an interpreted
+loop.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover - exercised only without numba
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+else:
+    HAVE_NUMBA = True
+
+
+# No fastmath: it lets LLVM assume there are no NaNs, and the NaN checks
+# below are what keep a single missing bar from poisoning the whole series.
+@njit(cache=True)
+def ema_nb(x: np.ndarray, alpha: float) -> np.ndarray:
+    """NaN bars hold the previous value and age it, as pandas does (ignore_na=False)."""
+    n = x.shape[0]
+    out = np.empty(n, dtype=np.float64)
+    weighted = np.nan
+    old_wt = 1.0
+    for i in range(n):
+        cur = x[i]
+        is_obs = cur == cur
+        if weighted == weighted:
+            old_wt *= 1.0 - alpha
+            if is_obs:
+                if weighted != cur:
+                    weighted = (old_wt * weighted + alpha * cur) / (old_wt + alpha)
+                old_wt = 1.0
+        elif is_obs:
+            weighted = cur
+        out[i] = weighted
+    return out
+
+
+@njit(cache=True)
+def sma_nb(x: np.ndarray, window: int) -> np.ndarray:
+    """Windows containing a NaN are NaN (min_periods == window); later ones recover."""
+    n = x.shape[0]
+    out = np.full(n, np.nan, dtype=np.float64)
+    if window <= 0:
+        return out
+    total = 0.0
+    valid = 0
+    for i in range(n):
+        cur = x[i]
+        if cur == cur:
+            total += cur
+            valid += 1
+        if i >= window:
+            old = x[i - window]
+            if old == old:
+                total -= old
+                valid -= 1
+        if i >= window - 1 and valid == window:
+            out[i] = total / window
+    return out
+
+
+@njit(cache=True)
+def atr_nb(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int) -> np.ndarray:
+    """True range is the largest non-NaN of its three legs (pandas ``max(axis=1)``)."""
+    n = close.shape[0]
+    tr = np.empty(n, dtype=np.float64)
+    for i in range(n):
+        best = high[i] - low[i]
+        if i > 0:
+            hc = abs(high[i] - close[i - 1])
+            lc = abs(low[i] - close[i - 1])
+            if hc == hc and not (hc <= best):
+                best = hc
+            if lc == lc and not (lc <= best):
+                best = lc
+        tr[i] = best
+    return sma_nb(tr, period)
+
+
+def sma_np(x: np.ndarray, window: int) -> np.ndarray:
+    """Rolling mean via cumulative sums of the values and of the valid-count."""
+    n = x.shape[0]
+    out = np.full(n, np.nan, dtype=np.float64)
+    if window <= 0 or n < window:
+        return out
+    valid = ~np.isnan(x)
+    csum = np.concatenate(([0.0], np.cumsum(np.where(valid, x, 0.0), dtype=np.float64)))
+    ccount = np.concatenate(([0], np.cumsum(valid)))
+    sums = csum[window:] - csum[:-window]
+    full = (ccount[window:] - ccount[:-window]) == window
+    out[window - 1 :] = np.where(full, sums / window, np.nan)
+    return out
+
+
+def atr_np(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int) -> np.ndarray:
+    prev_close = np.empty_like(close)
+    if close.shape[0]:
+        prev_close[0] = np.nan
+        prev_close[1:] = close[:-1]
+    # fmax skips NaN legs, matching pandas' max(axis=1).
+    tr = np.fmax.reduce([high - low, np.abs(high - prev_close), np.abs(low - prev_close)])
+    return sma_np(tr, period)
+
+
+if not HAVE_NUMBA:  # pragma: no cover - exercised only without numba
+    sma_nb = sma_np  # noqa: F811
+    atr_nb = atr_np  # noqa: F811
+
+
+def _warm_up() -> None:
+    """Compile every kernel once at import so the first ticker pays no JIT cost."""
+    dummy = np.linspace(1.0, 2.0, 32)
+    ema_nb(dummy, 0.1)
+    sma_nb(dummy, 5)
+    atr_nb(dummy + 0.5, dummy - 0.5, dummy, 14)
+
+
+_warm_up()
@@ -17,12 +17,17 @@ Outputs:
 from __future__ import annotations
 
 import argparse
-import csv
+import heapq
 import json
 import math
 import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
+from functools import partial
+from operator import itemgetter
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
@@ -30,28 +35,168 @@ import pandas as pd
 import numpy as np
 import requests
 import time
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - parquet sidecars are optional
+    pa = None
+    pacsv = None
+    pq = None
+
+from bars_cache import append_snapshot_bar, get_bars_cached
+from indicators_nb import atr_nb, ema_nb, sma_nb
 
 ROOT = Path(__file__).resolve().parent
 DATA_DIR = ROOT / 'data'
 EARNINGS_CACHE_PATH = DATA_DIR / 'earnings_cache.json'
+EARNINGS_DB_PATH = DATA_DIR / 'earnings_cache.db'
 CACHE_TTL_DAYS = 3
-
-
-
-def load_earnings_cache() -> Dict[str, Dict[str, str]]:
-    if not EARNINGS_CACHE_PATH.exists():
-        return {}
+EARNINGS_HORIZON_DAYS = 7
+MARKET_TICKERS = ("SPY", "QQQ")
+FETCH_WORKERS = 16
+SNAPSHOT_CHUNK = 100
+NS_PER_DAY = 86_400_000_000_000
+
+_THREAD_LOCAL = threading.local()
+_YF_LOCK = threading.Lock()
+_BARS_MEMO: Dict[Tuple[str, str], pd.DataFrame] = {}
+# Provider query window shared by every fetch in a run; see set_run_clock().
+_RUN_CLOCK: Dict[str, object] = {}
+
+
+def set_run_clock(now: Optional[datetime] = None) -> datetime:
+    """Pin "now" once per run so fetchers don't each call datetime.now()."""
+    now = now or datetime.now(timezone.utc)
+    _RUN_CLOCK["now"] = now
+    _RUN_CLOCK["end_str"] = now.date().isoformat()
+    _RUN_CLOCK["to_ts"] = int(now.timestamp())
+    return now
+
+
+def _http_session() -> requests.Session:
+    """Per-thread pooled session: keep-alive connections plus retry on 429/5xx."""
+    session = getattr(_THREAD_LOCAL, "session", None)
+    if session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=32,
+            max_retries=Retry(total=2, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504]),
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        _THREAD_LOCAL.session = session
+    return session
+
+
+class EarningsCache:
+    """sqlite-backed earnings cache with per-row TTL.
+
+    Rows are looked up lazily, one ticker at a time, and only rows fetched
+    within ``CACHE_TTL_DAYS`` of ``today`` are returned. Writes stay in memory until
+    ``flush`` upserts just the rows that changed. Safe to share across the
+    fetch worker threads.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        legacy_json: Optional[Path] = None,
+        today: Optional[datetime.date] = None,
+    ) -> None:
+        self.path = path
+        self.legacy_json = legacy_json
+        today = today or datetime.now(timezone.utc).date()
+        self._fresh_since = (today - timedelta(days=CACHE_TTL_DAYS)).isoformat()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._rows: Dict[str, Optional[Dict[str, Optional[str]]]] = {}
+        self._dirty: set = set()
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS earnings"
+                "(ticker TEXT PRIMARY KEY, next_earnings TEXT, fetched_at TEXT)"
+            )
+            self._conn = conn
+            self._import_legacy_json()
+        return self._conn
+
+    def _import_legacy_json(self) -> None:
+        """Seed an empty table from the old earnings_cache.json, if present."""
+        if self.legacy_json is None or not self.legacy_json.exists():
+            return
+        if self._conn.execute("SELECT 1 FROM earnings LIMIT 1").fetchone():
+            return
+        try:
+            legacy = json.loads(self.legacy_json.read_text())
+        except Exception:
+            return
+        rows = [
+            (ticker.upper(), entry.get("next_earnings"), entry.get("fetched_at"))
+            for ticker, entry in legacy.items()
+            if isinstance(entry, dict)
+        ]
+        with self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO earnings VALUES (?, ?, ?)", rows)
+
+    def get(self, ticker: str, default: Optional[Dict[str, Optional[str]]] = None) -> Optional[Dict[str, Optional[str]]]:
+        key = ticker.upper()
+        with self._lock:
+            if key not in self._rows:
+                try:
+                    row = self._connect().execute(
+                        "SELECT next_earnings, fetched_at FROM earnings"
+                        " WHERE ticker = ? AND fetched_at >= ?",
+                        (key, self._fresh_since),
+                    ).fetchone()
+                except sqlite3.Error:
+                    row = None
+                self._rows[key] = {"next_earnings": row[0], "fetched_at": row[1]} if row else None
+            entry = self._rows[key]
+        return entry if entry is not None else default
+
+    def __setitem__(self, ticker: str, entry: Dict[str, Optional[str]]) -> None:
+        key = ticker.upper()
+        with self._lock:
+            self._rows[key] = entry
+            self._dirty.add(key)
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            rows = [
+                (key, self._rows[key].get("next_earnings"), self._rows[key].get("fetched_at"))
+                for key in sorted(self._dirty)
+            ]
+            conn = self._connect()
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO earnings VALUES (?, ?, ?)", rows)
+            self._dirty.clear()
+
+
+def load_earnings_cache(today: Optional[datetime.date] = None) -> EarningsCache:
+    cache = EarningsCache(EARNINGS_DB_PATH, legacy_json=EARNINGS_CACHE_PATH, today=today)
+    # Create the file up front: the EOD workflow stages data/*.db even on
+    # days when no earnings lookups run.
     try:
-        return json.loads(EARNINGS_CACHE_PATH.read_text())
-    except Exception:
-        return {}
+        cache._connect()
+    except sqlite3.Error:
+        pass
+    return cache
 
 
-def save_earnings_cache(cache: Dict[str, Dict[str, str]]) -> None:
+def save_earnings_cache(cache: EarningsCache) -> None:
     try:
-        DATA_DIR.mkdir(parents=True, exist_ok=True)
-        EARNINGS_CACHE_PATH.write_text(json.dumps(cache, indent=2))
+        cache.flush()
     except Exception:
         pass
 
@@ -68,12 +213,12 @@ def parse_date(value: Optional[str]) -> Optional[datetime.date]:
             return None
 
 
-def fetch_next_earnings_finnhub(ticker: str) -> Optional[datetime.date]:
+def fetch_next_earnings_finnhub(
+    ticker: str, today: datetime.date, horizon: datetime.date
+) -> Optional[datetime.date]:
     api_key = os.getenv("FINNHUB_API_KEY")
     if not api_key:
         return None
-    today = datetime.now(timezone.utc).date()
-    horizon = today + timedelta(days=7)
     url = "https://finnhub.io/api/v1/calendar/earnings"
     params = {
         "symbol": ticker.upper(),
@@ -82,7 +227,7 @@ def fetch_next_earnings_finnhub(ticker: str) -> Optional[datetime.date]:
         "token": api_key,
     }
     try:
-        resp = requests.get(url, params=params, timeout=10)
+        resp = _http_session().get(url, params=params, timeout=10)
         resp.raise_for_status()
         payload = resp.json()
     except Exception:
@@ -95,11 +240,34 @@ def fetch_next_earnings_finnhub(ticker: str) -> Optional[datetime.date]:
     return min(candidates)
 
 
-def fetch_next_earnings_polygon(ticker: str) -> Optional[datetime.date]:
+def fetch_earnings_calendar_bulk(from_date: datetime.date, to_date: datetime.date) -> Dict[str, datetime.date]:
+    """Earliest earnings date per symbol from one unfiltered Finnhub calendar call."""
+    api_key = os.getenv("FINNHUB_API_KEY")
+    if not api_key:
+        return {}
+    url = "https://finnhub.io/api/v1/calendar/earnings"
+    params = {"from": from_date.isoformat(), "to": to_date.isoformat(), "token": api_key}
+    try:
+        resp = _http_session().get(url, params=params, timeout=20)
+        resp.raise_for_status()
+        payload = resp.json()
+    except Exception:
+        return {}
+    earliest: Dict[str, datetime.date] = {}
+    for item in payload.get("earningsCalendar") or []:
+        symbol = (item.get("symbol") or "").upper()
+        day = parse_date(item.get("date"))
+        if not symbol or not day or day < from_date:
+            continue
+        if symbol not in earliest or day < earliest[symbol]:
+            earliest[symbol] = day
+    return earliest
+
+
+def fetch_next_earnings_polygon(ticker: str, today: datetime.date) -> Optional[datetime.date]:
     api_key = os.getenv("POLYGON_API_KEY")
     if not api_key:
         return None
-    today = datetime.now(timezone.utc).date()
     url = "https://api.polygon.io/vX/reference/events/earnings"
     params = {
         "ticker": ticker.upper(),
@@ -110,7 +278,7 @@ def fetch_next_earnings_polygon(ticker: str) -> Optional[datetime.date]:
         "start": today.isoformat(),
     }
     try:
-        resp = requests.get(url, params=params, timeout=10)
+        resp = _http_session().get(url, params=params, timeout=10)
         resp.raise_for_status()
         payload = resp.json()
     except Exception:
@@ -154,21 +322,21 @@ def fetch_next_earnings_yfinance(ticker: str) -> Optional[datetime.date]:
     return None
 
 
-def get_next_earnings_date(ticker: str, cache: Dict[str, Dict[str, str]]) -> Optional[datetime.date]:
-    today = datetime.now(timezone.utc).date()
+def get_next_earnings_date(
+    ticker: str, cache: EarningsCache, today: datetime.date
+) -> Optional[datetime.date]:
+    # The cache only returns rows still inside CACHE_TTL_DAYS.
     entry = cache.get(ticker.upper())
     if entry:
-        fetched = parse_date(entry.get("fetched_at"))
-        if fetched and (today - fetched).days <= CACHE_TTL_DAYS:
-            cached_date = parse_date(entry.get("next_earnings"))
-            if cached_date:
-                return cached_date
-            if entry.get("next_earnings") is None:
-                return None
+        cached_date = parse_date(entry.get("next_earnings"))
+        if cached_date:
+            return cached_date
+        if entry.get("next_earnings") is None:
+            return None
     # fetch fresh
     next_date = (
-        fetch_next_earnings_finnhub(ticker)
-        or fetch_next_earnings_polygon(ticker)
+        fetch_next_earnings_finnhub(ticker, today, today + timedelta(days=EARNINGS_HORIZON_DAYS))
+        or fetch_next_earnings_polygon(ticker, today)
         or fetch_next_earnings_yfinance(ticker)
     )
     cache[ticker.upper()] = {
@@ -178,31 +346,57 @@ def get_next_earnings_date(ticker: str, cache: Dict[str, Dict[str, str]]) -> Opt
     return next_date
 
 
-def _mock_bars(ticker: str, periods: int = 180) -> pd.DataFrame:
-    rng = pd.date_range(end=datetime.now(timezone.utc).date(), periods=periods, freq="B")
+def _mock_base_prices(periods: int) -> np.ndarray:
     base = np.linspace(0, 1, periods)
-    prices = 100 + 5 * np.sin(2 * np.pi * base) + np.linspace(0, 15, periods)
-    df = pd.DataFrame(index=rng)
-    noise = np.random.normal(0, 0.01, periods)
-    df["close"] = prices * (1 + noise) + (hash(ticker) % 500) * 0.05
-    df["open"] = df["close"].shift(1).fillna(df["close"]) * (1 + np.random.normal(0, 0.002, periods))
-    upper = np.abs(np.random.normal(0.005, 0.003, periods))
-    lower = np.abs(np.random.normal(0.005, 0.003, periods))
-    df["high"] = np.maximum(df["open"], df["close"]) * (1 + upper)
-    df["low"] = np.minimum(df["open"], df["close"]) * (1 - lower)
-    df["volume"] = (1_000_000 + np.random.randint(0, 750_000, periods)).astype(int)
+    return 100 + 5 * np.sin(2 * np.pi * base) + np.linspace(0, 15, periods)
+
+
+_MOCK_PERIODS = 180
+_MOCK_BASE_PRICES = _mock_base_prices(_MOCK_PERIODS)
+
+
+def _mock_bars(ticker: str, periods: int = _MOCK_PERIODS) -> pd.DataFrame:
+    rng_index = pd.date_range(end=datetime.now(timezone.utc).date(), periods=periods, freq="B")
+    prices = _MOCK_BASE_PRICES if periods == _MOCK_PERIODS else _mock_base_prices(periods)
+    rng = np.random.default_rng(hash(ticker) & 0xFFFFFFFF)
+    # One draw covers close noise, open noise and the upper/lower wicks.
+    z = rng.standard_normal(size=(4, periods))
+    close = prices * (1 + 0.01 * z[0]) + (hash(ticker) % 500) * 0.05
+    prev_close = np.roll(close, 1)
+    prev_close[0] = close[0]
+    open_ = prev_close * (1 + 0.002 * z[1])
+    upper = np.abs(0.005 + 0.003 * z[2])
+    lower = np.abs(0.005 + 0.003 * z[3])
+    df = pd.DataFrame(
+        {
+            "close": close,
+            "open": open_,
+            "high": np.maximum(open_, close) * (1 + upper),
+            "low": np.minimum(open_, close) * (1 - lower),
+            "volume": 1_000_000 + rng.integers(0, 750_000, periods),
+        },
+        index=rng_index,
+    )
     df.attrs["source"] = "synthetic"
     return df
 
 
 
 
-def fetch_polygon_daily_bars(ticker: str, start: datetime) -> pd.DataFrame:
+def fetch_polygon_daily_bars(ticker: str, start: datetime, strict: bool = False) -> pd.DataFrame:
+    """Polygon daily aggregates from ``start``; empty when unavailable.
+
+    With ``strict`` a failed request raises instead, and an empty result is
+    returned without the retry, so callers can tell "no new sessions" apart
+    from "Polygon did not answer".
+    """
     api_key = os.getenv("POLYGON_API_KEY")
     if not api_key:
+        if strict:
+            raise RuntimeError("POLYGON_API_KEY is not set")
         return pd.DataFrame()
-    start_str = start.date().strftime("%Y-%m-%d")
-    end_str = datetime.now(timezone.utc).date().strftime("%Y-%m-%d")
+    start_str = start.date().isoformat()
+    end_str = _RUN_CLOCK.get("end_str") or datetime.now(timezone.utc).date().isoformat()
     url = f"https://api.polygon.io/v2/aggs/ticker/{ticker.upper()}/range/1/day/{start_str}/{end_str}"
     params = {
         "adjusted": "false",
@@ -212,45 +406,46 @@ def fetch_polygon_daily_bars(ticker: str, start: datetime) -> pd.DataFrame:
     }
     for attempt in range(2):
         try:
-            resp = requests.get(url, params=params, timeout=10)
+            resp = _http_session().get(url, params=params, timeout=10)
             resp.raise_for_status()
             payload = resp.json()
         except Exception:
+            if strict:
+                raise
             payload = None
         if not payload:
+            if strict:
+                raise RuntimeError(f"Polygon returned no payload for {ticker}")
             return pd.DataFrame()
         if payload.get("status") == "ERROR":
             error_msg = (payload.get("error") or "").lower()
             if "exceeded" in error_msg and attempt == 0:
                 time.sleep(2)
                 continue
+            if strict:
+                raise RuntimeError(f"Polygon error for {ticker}: {error_msg}")
             return pd.DataFrame()
         results = payload.get("results") or []
         if not results:
-            if attempt == 0:
+            if attempt == 0 and not strict:
                 time.sleep(1)
                 continue
             return pd.DataFrame()
-        rows = []
-        for item in results:
-            ts = item.get("t")
-            if ts is None:
-                continue
-            dt = datetime.fromtimestamp(ts / 1000, tz=timezone.utc)
-            rows.append(
-                {
-                    "date": dt,
-                    "open": item.get("o"),
-                    "high": item.get("h"),
-                    "low": item.get("l"),
-                    "close": item.get("c"),
-                    "volume": item.get("v"),
-                }
-            )
-        if rows:
-            df = pd.DataFrame(rows).set_index("date").sort_index()
+        results = [item for item in results if item.get("t") is not None]
+        if results:
+            # Build columns straight from the payload: no per-bar dicts or datetimes.
+            n = len(results)
+            ts = np.fromiter((item["t"] for item in results), dtype=np.int64, count=n)
+            columns = {
+                name: np.fromiter((item.get(key, np.nan) for item in results), dtype=np.float64, count=n)
+                for name, key in (("open", "o"), ("high", "h"), ("low", "l"), ("close", "c"), ("volume", "v"))
+            }
+            index = pd.DatetimeIndex(pd.to_datetime(ts, unit="ms", utc=True), name="date")
+            df = pd.DataFrame(columns, index=index).sort_index()
             df.attrs["source"] = "polygon"
             return df
+    if strict:
+        raise RuntimeError(f"Polygon rate limit exceeded for {ticker}")
     return pd.DataFrame()
 
 def fetch_finnhub_daily_bars(ticker: str, start: datetime) -> pd.DataFrame:
@@ -258,16 +453,18 @@ def fetch_finnhub_daily_bars(ticker: str, start: datetime) -> pd.DataFrame:
     if not api_key:
         return pd.DataFrame()
     url = "https://finnhub.io/api/v1/stock/candle"
+    from_ts = int(start.replace(tzinfo=timezone.utc).timestamp())
+    to_ts = _RUN_CLOCK.get("to_ts") or int(datetime.now(timezone.utc).timestamp())
     for symbol in (ticker.upper(), f"US:{ticker.upper()}"):
         params = {
             "symbol": symbol,
             "resolution": "D",
-            "from": int(start.replace(tzinfo=timezone.utc).timestamp()),
-            "to": int(datetime.now(timezone.utc).timestamp()),
+            "from": from_ts,
+            "to": to_ts,
             "token": api_key,
         }
         try:
-            resp = requests.get(url, params=params, timeout=10)
+            resp = _http_session().get(url, params=params, timeout=10)
             resp.raise_for_status()
             data = resp.json()
         except Exception:
@@ -292,7 +489,56 @@ def fetch_finnhub_daily_bars(ticker: str, start: datetime) -> pd.DataFrame:
         return df
     return pd.DataFrame()
 
+def fetch_polygon_snapshot_batch(tickers: List[str]) -> Dict[str, Dict[str, object]]:
+    """Latest session OHLCV for many tickers via Polygon's snapshot endpoint.
+
+    One request covers up to ``SNAPSHOT_CHUNK`` symbols. Returns
+    ``{ticker: {"date", "open", "high", "low", "close", "volume"}}`` and
+    silently omits anything the endpoint does not report.
+    """
+    api_key = os.getenv("POLYGON_API_KEY")
+    if not api_key or not tickers:
+        return {}
+    url = "https://api.polygon.io/v2/snapshot/locale/us/markets/stocks/tickers"
+    symbols = sorted({t.upper() for t in tickers})
+    snapshots: Dict[str, Dict[str, object]] = {}
+    for i in range(0, len(symbols), SNAPSHOT_CHUNK):
+        params = {"tickers": ",".join(symbols[i : i + SNAPSHOT_CHUNK]), "apiKey": api_key}
+        try:
+            resp = _http_session().get(url, params=params, timeout=10)
+            resp.raise_for_status()
+            payload = resp.json()
+        except Exception:
+            continue
+        for item in payload.get("tickers") or []:
+            day = item.get("day") or {}
+            updated = item.get("updated")
+            if not updated or not day.get("c"):
+                continue
+            session_date = pd.Timestamp(updated, unit="ns", tz="UTC").tz_convert("America/New_York").date()
+            snapshots[str(item.get("ticker", "")).upper()] = {
+                "date": session_date,
+                "open": day.get("o"),
+                "high": day.get("h"),
+                "low": day.get("l"),
+                "close": day.get("c"),
+                "volume": day.get("v"),
+            }
+    return snapshots
+
+
 def get_bars(ticker: str, start: datetime) -> pd.DataFrame:
+    """Fetch daily bars, memoized per (ticker, start date) for the current run."""
+    key = (ticker.upper(), start.date().isoformat())
+    cached = _BARS_MEMO.get(key)
+    if cached is not None:
+        return cached
+    df = _download_bars(ticker, start)
+    _BARS_MEMO[key] = df
+    return df
+
+
+def _download_bars(ticker: str, start: datetime) -> pd.DataFrame:
     """Fetch daily bars favoring Polygon -> Finnhub -> yfinance -> synthetic."""
     for fetcher in (fetch_polygon_daily_bars, fetch_finnhub_daily_bars):
         try:
@@ -308,15 +554,18 @@ def get_bars(ticker: str, start: datetime) -> pd.DataFrame:
         raise RuntimeError("yfinance is required; run `pip install -r requirements.txt`.") from exc
 
     try:
-        df = yf.download(
-            ticker,
-            start=start.strftime("%Y-%m-%d"),
-            progress=False,
-            auto_adjust=True,
-            threads=False,
-        )
-        if df.empty:
-            df = yf.Ticker(ticker).history(period="2y", auto_adjust=True, actions=False)
+        # yf.download resets module-global result dicts on every call, so
+        # concurrent fetch workers must take turns.
+        with _YF_LOCK:
+            df = yf.download(
+                ticker,
+                start=start.date().isoformat(),
+                progress=False,
+                auto_adjust=True,
+                threads=False,
+            )
+            if df.empty:
+                df = yf.Ticker(ticker).history(period="2y", auto_adjust=True, actions=False)
         if not df.empty:
             if isinstance(df.columns, pd.MultiIndex):
                 df.columns = [str(col[0]).lower() for col in df.columns]
@@ -334,25 +583,63 @@ def get_bars(ticker: str, start: datetime) -> pd.DataFrame:
     return fallback
 
 
-def compute_atr(df: pd.DataFrame, period: int = 14) -> pd.Series:
-    high_low = df["high"] - df["low"]
-    high_close = (df["high"] - df["close"].shift()).abs()
-    low_close = (df["low"] - df["close"].shift()).abs()
-    tr = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-    return tr.rolling(period).mean()
-
-def _ema(series: pd.Series, span: int) -> pd.Series:
-    return series.ewm(span=span, adjust=False).mean()
-
-
-def _sma(series: pd.Series, window: int) -> pd.Series:
-    return series.rolling(window).mean()
-
-
-def check_market_filter(start: datetime) -> Tuple[bool, str]:
-    """Return (market_ok, reason) using SPY & QQQ trend health."""
-    spy = get_bars("SPY", start)
-    qqq = get_bars("QQQ", start)
+def fetch_phase(
+    tickers: List[str],
+    start: datetime,
+    snapshots: Optional[Dict[str, Dict[str, object]]] = None,
+) -> Dict[str, pd.DataFrame]:
+    """Load bars for every ticker concurrently (Parquet cache, then network)."""
+    snapshots = snapshots or {}
+    # The incremental slice is Polygon-only; without a key a lagging cache
+    # goes straight to the full provider chain.
+    fetch_since = partial(fetch_polygon_daily_bars, strict=True) if os.getenv("POLYGON_API_KEY") else None
+
+    def fetch(ticker: str) -> pd.DataFrame:
+        snapshot = snapshots.get(ticker.upper())
+        df = get_bars_cached(ticker, start, get_bars, fetch_since, snapshot, now=_RUN_CLOCK.get("now"))
+        return append_snapshot_bar(df, snapshot)
+
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+        frames = executor.map(fetch, tickers)
+        return dict(zip(tickers, frames))
+
+
+def prefetch_earnings(
+    tickers: List[str], cache: EarningsCache, today: datetime.date
+) -> Dict[str, Optional[datetime.date]]:
+    """Resolve next earnings dates concurrently, filling ``cache`` as it goes."""
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+        dates = executor.map(lambda ticker: get_next_earnings_date(ticker, cache, today), tickers)
+        return dict(zip(tickers, dates))
+
+
+def ema_last(arr: np.ndarray, span: int) -> float:
+    """Final value of ``ewm(span=span, adjust=False).mean()`` as one dot product."""
+    n = arr.shape[0]
+    alpha = 2.0 / (span + 1)
+    if np.isnan(arr).any():
+        # The closed form would propagate the gap; the recurrence skips it like pandas.
+        return float(ema_nb(arr, alpha)[-1])
+    weights = alpha * (1.0 - alpha) ** np.arange(n - 1, -1, -1, dtype=np.float64)
+    weights[0] = (1.0 - alpha) ** (n - 1)
+    return float(weights @ arr)
+
+
+def sma_last(arr: np.ndarray, window: int) -> float:
+    return float(arr[-window:].mean())
+
+
+def check_market_filter(
+    start: datetime, bars: Optional[Dict[str, pd.DataFrame]] = None
+) -> Tuple[bool, str]:
+    """Return (market_ok, reason) using SPY & QQQ trend health.
+
+    ``bars`` may carry frames already downloaded by ``fetch_phase``; missing
+    symbols are fetched on demand.
+    """
+    bars = bars or {}
+    spy = bars["SPY"] if "SPY" in bars else get_bars("SPY", start)
+    qqq = bars["QQQ"] if "QQQ" in bars else get_bars("QQQ", start)
 
     if spy.empty or qqq.empty:
         return True, "market_check_skipped: insufficient_data"
@@ -368,25 +655,15 @@ def check_market_filter(start: datetime) -> Tuple[bool, str]:
     if len(spy) < 60 or len(qqq) < 60:
         return True, "market_check_skipped: insufficient_data"
 
-    spy["ema20"] = _ema(spy["close"], 20)
-    spy["sma50"] = _sma(spy["close"], 50)
-    qqq["ema20"] = _ema(qqq["close"], 20)
-    qqq["sma50"] = _sma(qqq["close"], 50)
-
-    spy_latest = spy.iloc[-1]
-    qqq_latest = qqq.iloc[-1]
-    spy_prev = spy.iloc[-6]
-    qqq_prev = qqq.iloc[-6]
-
-    def healthy(latest, prev) -> bool:
-        return (
-            latest["close"] > latest["ema20"]
-            and latest["close"] > latest["sma50"]
-            and latest["sma50"] > prev["sma50"]
-        )
+    # Only the latest EMA20/SMA50 (and SMA50 five bars back) are needed.
+    spy_close = spy["close"].to_numpy(np.float64)
+    qqq_close = qqq["close"].to_numpy(np.float64)
 
-    spy_ok = healthy(spy_latest, spy_prev)
-    qqq_ok = healthy(qqq_latest, qqq_prev)
+    spy_last, spy_ema20, spy_sma50 = spy_close[-1], ema_last(spy_close, 20), sma_last(spy_close, 50)
+    qqq_last, qqq_ema20, qqq_sma50 = qqq_close[-1], ema_last(qqq_close, 20), sma_last(qqq_close, 50)
+
+    spy_ok = bool(spy_last > spy_ema20 and spy_last > spy_sma50 and spy_sma50 > sma_last(spy_close[:-5], 50))
+    qqq_ok = bool(qqq_last > qqq_ema20 and qqq_last > qqq_sma50 and qqq_sma50 > sma_last(qqq_close[:-5], 50))
 
     if spy_ok and qqq_ok:
         return True, "market_ok: SPY & QQQ in uptrend"
@@ -434,37 +711,144 @@ class Position:
         }
 
 
+# (field, Arrow type alias) in output order for the signals and ledger files.
+SIGNAL_COLUMNS: List[Tuple[str, str]] = [
+    ("date", "string"),
+    ("ticker", "string"),
+    ("strategy", "string"),
+    ("setup", "bool"),
+    ("action", "string"),
+    ("buy_zone_low", "double"),
+    ("buy_zone_high", "double"),
+    ("confirm_today", "bool"),
+    ("close", "double"),
+    ("ema9", "double"),
+    ("ema20", "double"),
+    ("atr14", "double"),
+    ("vol", "int64"),
+    ("vol20", "int64"),
+    ("notes", "string"),
+    ("market_ok", "bool"),
+    ("market_reason", "string"),
+    ("next_earnings", "string"),
+]
+LEDGER_COLUMNS: List[Tuple[str, str]] = [
+    ("ticker", "string"),
+    ("strategy", "string"),
+    ("status", "string"),
+    ("entry_date", "string"),
+    ("entry_price", "double"),
+    ("exit_date", "string"),
+    ("exit_price", "double"),
+    ("pct_since_entry", "double"),
+    ("r_peak", "double"),
+    ("days_held", "int64"),
+    ("highest_close", "double"),
+    ("notes", "string"),
+]
+LEDGER_TEXT_DEFAULTS: Dict[str, Optional[str]] = {
+    "ticker": "",
+    "strategy": "BASE",
+    "status": "OPEN",
+    "entry_date": None,
+    "exit_date": None,
+    "notes": "",
+}
+LEDGER_NUMERIC_COLUMNS = ["entry_price", "exit_price", "pct_since_entry", "r_peak", "days_held", "highest_close"]
+
+
+def _optional_float(value: float) -> Optional[float]:
+    return None if math.isnan(value) else float(value)
+
+
+def _read_ledger_csv(path: str) -> pd.DataFrame:
+    """Parse the ledger CSV with text columns kept verbatim (blank -> missing)."""
+    if pacsv is not None:
+        # Explicit Arrow column types: nothing is inferred, so "0001" or
+        # "1.50" in a text column is never rewritten as a number.
+        column_types = {col: pa.string() for col in LEDGER_TEXT_DEFAULTS}
+        column_types.update({col: pa.float64() for col in LEDGER_NUMERIC_COLUMNS})
+        options = pacsv.ConvertOptions(
+            column_types=column_types,
+            null_values=[""],
+            strings_can_be_null=True,
+        )
+        return pacsv.read_csv(path, convert_options=options).to_pandas(types_mapper=pd.ArrowDtype)
+    dtypes = {col: str for col in LEDGER_TEXT_DEFAULTS}
+    dtypes.update({col: "float64" for col in LEDGER_NUMERIC_COLUMNS})
+    return pd.read_csv(path, dtype=dtypes, na_values=[""], keep_default_na=False)
+
+
 def load_existing_ledger(path: str) -> Dict[str, Position]:
     if not os.path.exists(path):
         return {}
-    df = pd.read_csv(path)
-    ledger: Dict[str, Position] = {}
-    for _, row in df.iterrows():
-        pos = Position(
-            ticker=row.get("ticker", ""),
-            strategy=row.get("strategy", "BASE"),
-            status=row.get("status", "OPEN"),
-            entry_date=row.get("entry_date") if not pd.isna(row.get("entry_date")) else None,
-            entry_price=float(row.get("entry_price")) if not pd.isna(row.get("entry_price")) else None,
-            exit_date=row.get("exit_date") if not pd.isna(row.get("exit_date")) else None,
-            exit_price=float(row.get("exit_price")) if not pd.isna(row.get("exit_price")) else None,
-            pct_since_entry=float(row.get("pct_since_entry")) if not pd.isna(row.get("pct_since_entry")) else None,
-            r_peak=float(row.get("r_peak")) if not pd.isna(row.get("r_peak")) else None,
-            days_held=int(row.get("days_held")) if not pd.isna(row.get("days_held")) else None,
-            highest_close=float(row.get("highest_close")) if not pd.isna(row.get("highest_close")) else None,
-            notes=row.get("notes", ""),
+    sidecar = parquet_sibling(path)
+    if pa is not None and os.path.exists(sidecar) and os.path.getmtime(sidecar) >= os.path.getmtime(path):
+        # Typed sidecar written alongside the CSV; no text parsing needed.
+        df = pd.read_parquet(sidecar)
+    else:
+        df = _read_ledger_csv(path)
+    n = len(df)
+
+    # Pull each column out once instead of materializing a Series per row.
+    text: Dict[str, List[Optional[str]]] = {}
+    for col, default in LEDGER_TEXT_DEFAULTS.items():
+        if col in df.columns:
+            series = df[col].astype(object)
+            text[col] = series.where(series.notna(), default).tolist()
+        else:
+            text[col] = [default] * n
+    num = {
+        col: df[col].to_numpy(np.float64, na_value=np.nan) if col in df.columns else np.full(n, np.nan)
+        for col in LEDGER_NUMERIC_COLUMNS
+    }
+
+    positions = [
+        Position(
+            ticker=text["ticker"][i],
+            strategy=text["strategy"][i],
+            status=text["status"][i],
+            entry_date=text["entry_date"][i],
+            entry_price=_optional_float(num["entry_price"][i]),
+            exit_date=text["exit_date"][i],
+            exit_price=_optional_float(num["exit_price"][i]),
+            pct_since_entry=_optional_float(num["pct_since_entry"][i]),
+            r_peak=_optional_float(num["r_peak"][i]),
+            days_held=None if math.isnan(num["days_held"][i]) else int(num["days_held"][i]),
+            highest_close=_optional_float(num["highest_close"][i]),
+            notes=text["notes"][i],
         )
-        ledger[pos.ticker] = pos
-    return ledger
+        for i in range(n)
+    ]
+    return {pos.ticker: pos for pos in positions}
 
 
 def write_csv(path: str, rows: List[Dict[str, object]], fieldnames: List[str]) -> None:
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "w", newline="") as handle:
-        writer = csv.DictWriter(handle, fieldnames=fieldnames)
-        writer.writeheader()
-        for row in rows:
-            writer.writerow(row)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    # object dtype + CRLF keep the output byte-identical to csv.DictWriter
+    # (ints stay ints, None stays blank).
+    frame = pd.DataFrame(rows, columns=fieldnames, dtype=object)
+    frame.to_csv(path, index=False, lineterminator="\r\n")
+
+
+def parquet_sibling(path: str) -> str:
+    return os.path.splitext(path)[0] + ".parquet"
+
+
+def write_both(path: str, rows: List[Dict[str, object]], columns: List[Tuple[str, str]]) -> None:
+    """Write ``rows`` as CSV plus a typed Parquet sidecar next to it.
+
+    ``columns`` pairs each field name with an Arrow type alias. The sidecar is
+    skipped when pyarrow is not installed.
+    """
+    write_csv(path, rows, [name for name, _ in columns])
+    if pa is None:
+        return
+    schema = pa.schema([(name, pa.type_for_alias(kind)) for name, kind in columns])
+    try:
+        pq.write_table(pa.Table.from_pylist(rows, schema=schema), parquet_sibling(path), compression="zstd")
+    except Exception:
+        pass
 
 
 def format_float(value: Optional[float], digits: int = 2) -> str:
@@ -474,8 +858,11 @@ def format_float(value: Optional[float], digits: int = 2) -> str:
 
 
 def run_strategy(args: argparse.Namespace) -> None:
-    start = datetime.now(timezone.utc) - timedelta(days=args.lookback_days)
+    now = set_run_clock()
+    start = now - timedelta(days=args.lookback_days)
     tickers = [t.strip().upper() for t in open(args.tickers_file).read().splitlines() if t.strip()]
+    tickers = list(dict.fromkeys(tickers))
+    _BARS_MEMO.clear()
 
     existing_ledger = load_existing_ledger(args.ledger)
     updated_positions: Dict[str, Position] = {}
@@ -485,32 +872,59 @@ def run_strategy(args: argparse.Namespace) -> None:
     suppressed_today: List[Dict[str, object]] = []
     filter_events: List[Dict[str, str]] = []
 
-    earnings_cache = load_earnings_cache()
-    market_ok, market_reason = check_market_filter(start)
-
-    today_date = datetime.now(timezone.utc).date()
-    now_iso = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    today_date = now.date()
+    earnings_cache = load_earnings_cache(today_date)
+
+    # One concurrent wave covers the universe and the market-filter symbols.
+    fetch_list = tickers + [t for t in MARKET_TICKERS if t not in tickers]
+    snapshots = fetch_polygon_snapshot_batch(fetch_list)
+    bars_by_ticker = fetch_phase(fetch_list, start, snapshots)
+    market_ok, market_reason = check_market_filter(start, bars_by_ticker)
+
+    allow_entries = market_ok or market_reason.startswith("market_check_skipped")
+    earnings_dates: Dict[str, Optional[datetime.date]] = {}
+    if allow_entries:
+        # One calendar call covers the whole universe; names it misses fall
+        # through to the per-ticker provider chain.
+        calendar = fetch_earnings_calendar_bulk(
+            today_date, today_date + timedelta(days=EARNINGS_HORIZON_DAYS)
+        )
+        for ticker in tickers:
+            if ticker in calendar:
+                earnings_cache[ticker] = {
+                    "next_earnings": calendar[ticker].isoformat(),
+                    "fetched_at": today_date.isoformat(),
+                }
+        earnings_dates = prefetch_earnings(tickers, earnings_cache, today_date)
 
     for ticker in tickers:
-        df = get_bars(ticker, start)
+        df = bars_by_ticker[ticker]
         if df.empty or len(df) < 30:
             continue
 
         df = df.sort_index()
         if isinstance(df.index, pd.DatetimeIndex) and df.index.tz is not None:
             df.index = df.index.tz_convert(None)
+        idx_ns = df.index.as_unit("ns").asi8
         if len(df) < 25:
             filter_events.append({"ticker": ticker, "filter": "INSUFFICIENT_HISTORY", "detail": "<25 bars after fetch"})
             continue
 
-        df["dollar_volume"] = df["close"] * df["volume"]
-        avg_dollar_volume = float(df["dollar_volume"].tail(20).mean())
+        # Pull raw arrays once; every screen below works on scalars from them.
+        open_ = df["open"].to_numpy(np.float64)
+        high = df["high"].to_numpy(np.float64)
+        low = df["low"].to_numpy(np.float64)
+        close = df["close"].to_numpy(np.float64)
+        volume = df["volume"].to_numpy(np.float64)
+
+        avg_dollar_volume = float((close[-20:] * volume[-20:]).mean())
         if avg_dollar_volume < 5_000_000:
             filter_events.append({"ticker": ticker, "filter": "LOW_DOLLAR_VOLUME", "detail": f"20d avg ${avg_dollar_volume/1_000_000:.1f}M"})
             continue
 
-        prev_close = float(df["close"].iloc[-2]) if len(df) >= 2 else float("nan")
-        open_today = float(df["open"].iloc[-1])
+        latest_close = float(close[-1])
+        prev_close = float(close[-2])
+        open_today = float(open_[-1])
         if prev_close and not math.isnan(prev_close) and prev_close != 0:
             gap_pct = abs(open_today - prev_close) / prev_close
         else:
@@ -519,39 +933,36 @@ def run_strategy(args: argparse.Namespace) -> None:
             filter_events.append({"ticker": ticker, "filter": "GAP_FILTER_TRIGGERED", "detail": f"gap {gap_pct*100:.1f}%"})
             continue
 
-        latest = df.iloc[-1]
         if prev_close and not math.isnan(prev_close) and prev_close != 0:
-            close_change = abs(latest["close"] - prev_close) / prev_close
+            close_change = abs(latest_close - prev_close) / prev_close
         else:
             close_change = 0.0
-        range_pct = (latest["high"] - latest["low"]) / latest["close"] if latest["close"] else 0.0
+        range_pct = (high[-1] - low[-1]) / latest_close if latest_close else 0.0
         if range_pct > 0.2 or close_change > 0.2:
             filter_events.append({"ticker": ticker, "filter": "DATA_SANITY_FLAG", "detail": f"range {range_pct*100:.1f}% change {close_change*100:.1f}%"})
             continue
 
-        df["ema9"] = df["close"].ewm(span=9, adjust=False).mean()
-        df["ema20"] = df["close"].ewm(span=20, adjust=False).mean()
-        df["atr14"] = compute_atr(df, 14)
-        df["vol20"] = df["volume"].rolling(20).mean()
+        ema9 = float(ema_nb(close, 2.0 / (9 + 1))[-1])
+        ema20 = float(ema_nb(close, 2.0 / (20 + 1))[-1])
+        atr14 = atr_nb(high, low, close, 14)
+        vol20 = float(sma_nb(volume, 20)[-1])
+        latest_atr14 = float(atr14[-1])
+        latest_volume = float(volume[-1])
 
-        latest = df.iloc[-1]
-        prev = df.iloc[-2]
-        latest_date = df.index[-1].strftime("%Y-%m-%d")
+        latest_date = str(df.index[-1].date())
 
-        buy_zone_low = float(round(min(latest["ema9"], latest["ema20"]), 2))
-        buy_zone_high = float(round(max(latest["ema9"], latest["ema20"]), 2))
-        in_buy_zone = buy_zone_low <= latest["close"] <= buy_zone_high
-        setup = bool(latest["ema9"] > latest["ema20"])
+        buy_zone_low = float(round(min(ema9, ema20), 2))
+        buy_zone_high = float(round(max(ema9, ema20), 2))
+        in_buy_zone = buy_zone_low <= latest_close <= buy_zone_high
+        setup = bool(ema9 > ema20)
         action = "WATCH"
         notes = ""
         entry_triggered = False
         suppressed_entry = False
         next_earnings_date = None
 
-        allow_entries = market_ok or market_reason.startswith("market_check_skipped")
-
         if setup and allow_entries:
-            next_earnings_date = get_next_earnings_date(ticker, earnings_cache)
+            next_earnings_date = earnings_dates.get(ticker)
             if next_earnings_date:
                 days_until = (next_earnings_date - today_date).days
                 if 0 <= days_until <= 2:
@@ -567,10 +978,10 @@ def run_strategy(args: argparse.Namespace) -> None:
                 action = "MARKET_FILTER_ACTIVE"
                 notes = f"Market filter active: {market_reason}"
                 suppressed_entry = True
-        elif setup and latest["close"] > buy_zone_high:
+        elif setup and latest_close > buy_zone_high:
             action = "WAIT_FOR_PULLBACK"
             notes = "Price extended above buy zone"
-        elif latest["close"] < latest["ema20"]:
+        elif latest_close < ema20:
             action = "EXIT_CANDIDATE"
             notes = "Close below EMA20"
 
@@ -581,12 +992,12 @@ def run_strategy(args: argparse.Namespace) -> None:
                     "strategy": "BASE",
                     "buy_zone_low": buy_zone_low,
                     "buy_zone_high": buy_zone_high,
-                    "close": float(round(latest["close"], 2)),
+                    "close": float(round(latest_close, 2)),
                     "reason": notes or action,
                 }
             )
 
-        confirm_today = bool(latest["close"] > prev["close"])
+        confirm_today = bool(latest_close > prev_close)
 
         if setup:
             market_flag = None if market_reason.startswith("market_check_skipped") else bool(market_ok)
@@ -600,12 +1011,12 @@ def run_strategy(args: argparse.Namespace) -> None:
                     "buy_zone_low": buy_zone_low,
                     "buy_zone_high": buy_zone_high,
                     "confirm_today": confirm_today,
-                    "close": float(round(latest["close"], 2)),
-                    "ema9": float(round(latest["ema9"], 2)),
-                    "ema20": float(round(latest["ema20"], 2)),
-                    "atr14": float(round(latest["atr14"], 2)) if not pd.isna(latest["atr14"]) else None,
-                    "vol": int(latest["volume"]) if not pd.isna(latest["volume"]) else None,
-                    "vol20": int(round(latest["vol20"])) if not pd.isna(latest["vol20"]) else None,
+                    "close": float(round(latest_close, 2)),
+                    "ema9": float(round(ema9, 2)),
+                    "ema20": float(round(ema20, 2)),
+                    "atr14": float(round(latest_atr14, 2)) if not math.isnan(latest_atr14) else None,
+                    "vol": int(latest_volume) if not math.isnan(latest_volume) else None,
+                    "vol20": int(round(vol20)) if not math.isnan(vol20) else None,
                     "notes": notes,
                     "market_ok": market_flag,
                     "market_reason": market_reason,
@@ -615,26 +1026,23 @@ def run_strategy(args: argparse.Namespace) -> None:
 
         existing = existing_ledger.get(ticker)
         if existing and existing.status == "OPEN":
-            entry_price = existing.entry_price or latest["close"]
+            entry_price = existing.entry_price or latest_close
             entry_date = existing.entry_date or latest_date
-            entry_ts = pd.to_datetime(entry_date)
-            if hasattr(entry_ts, 'tz_convert') and entry_ts.tzinfo is not None:
+            try:
+                entry_ts = pd.Timestamp(entry_date)
+            except (TypeError, ValueError):
+                # Hand-edited ledgers may carry a date pandas cannot read.
+                entry_ts = pd.Timestamp(latest_date)
+            if entry_ts.tzinfo is not None:
                 entry_ts = entry_ts.tz_convert(None)
-            if entry_ts in df.index:
-                entry_idx = int(df.index.get_loc(entry_ts))
-            else:
-                entry_idx = int(df.index.searchsorted(entry_ts))
-                if entry_idx >= len(df):
-                    entry_idx = len(df) - 1
-            entry_idx = max(entry_idx, 0)
-            window = df.iloc[entry_idx:]
-            highest_close = float(round(window["close"].max(), 2))
-            pct_since_entry = float(round((latest["close"] / entry_price - 1) * 100, 2))
+            entry_ns = int(entry_ts.normalize().as_unit("ns").value)
+            entry_idx = min(int(np.searchsorted(idx_ns, entry_ns)), len(idx_ns) - 1)
+            highest_close = float(round(close[entry_idx:].max(), 2))
+            pct_since_entry = float(round((latest_close / entry_price - 1) * 100, 2))
             peak_r = None
-            if not window["atr14"].isna().all():
-                atr_at_entry = window["atr14"].iloc[0]
-                if atr_at_entry and not math.isnan(atr_at_entry) and atr_at_entry != 0:
-                    peak_r = float(round((highest_close - entry_price) / atr_at_entry, 2))
+            atr_at_entry = float(atr14[entry_idx])
+            if not math.isnan(atr_at_entry) and atr_at_entry != 0:
+                peak_r = float(round((highest_close - entry_price) / atr_at_entry, 2))
 
             position = Position(
                 ticker=ticker,
@@ -644,7 +1052,7 @@ def run_strategy(args: argparse.Namespace) -> None:
                 entry_price=entry_price,
                 pct_since_entry=pct_since_entry,
                 r_peak=peak_r,
-                days_held=int((pd.to_datetime(latest_date) - pd.to_datetime(entry_date)).days),
+                days_held=int((idx_ns[-1] - entry_ns) // NS_PER_DAY),
                 highest_close=highest_close,
                 notes=existing.notes,
             )
@@ -654,10 +1062,10 @@ def run_strategy(args: argparse.Namespace) -> None:
                 position.r_peak = 0.0
                 position.highest_close = entry_price
 
-            if latest["close"] < latest["ema20"]:
+            if latest_close < ema20:
                 position.status = "CLOSED"
                 position.exit_date = latest_date
-                position.exit_price = float(round(latest["close"], 2))
+                position.exit_price = float(round(latest_close, 2))
                 position.notes = "EMA20_break_exit"
                 closed_today.append(position)
             else:
@@ -670,11 +1078,11 @@ def run_strategy(args: argparse.Namespace) -> None:
                 strategy="BASE",
                 status="OPEN",
                 entry_date=latest_date,
-                entry_price=float(round(latest["close"], 2)),
+                entry_price=float(round(latest_close, 2)),
                 pct_since_entry=0.0,
                 r_peak=0.0,
                 days_held=0,
-                highest_close=float(round(latest["close"], 2)),
+                highest_close=float(round(latest_close, 2)),
                 notes="Entered on buy zone trigger",
             )
             updated_positions[ticker] = position
@@ -686,51 +1094,14 @@ def run_strategy(args: argparse.Namespace) -> None:
             updated_positions.setdefault(ticker, position)
 
     ledger_rows = [pos.to_dict() for pos in updated_positions.values()]
-    ledger_rows.sort(key=lambda r: (r["status"] != "OPEN", r["ticker"]))
-
-    write_csv(
-        args.emit,
-        signal_rows,
-        [
-            "date",
-            "ticker",
-            "strategy",
-            "setup",
-            "action",
-            "buy_zone_low",
-            "buy_zone_high",
-            "confirm_today",
-            "close",
-            "ema9",
-            "ema20",
-            "atr14",
-            "vol",
-            "vol20",
-            "notes",
-            "market_ok",
-            "market_reason",
-            "next_earnings",
-        ],
-    )
+    # Ticker order, then a stable split so OPEN rows lead.
+    ledger_rows.sort(key=itemgetter("ticker"))
+    ledger_rows = [r for r in ledger_rows if r["status"] == "OPEN"] + [
+        r for r in ledger_rows if r["status"] != "OPEN"
+    ]
 
-    write_csv(
-        args.ledger,
-        ledger_rows,
-        [
-            "ticker",
-            "strategy",
-            "status",
-            "entry_date",
-            "entry_price",
-            "exit_date",
-            "exit_price",
-            "pct_since_entry",
-            "r_peak",
-            "days_held",
-            "highest_close",
-            "notes",
-        ],
-    )
+    write_both(args.emit, signal_rows, SIGNAL_COLUMNS)
+    write_both(args.ledger, ledger_rows, LEDGER_COLUMNS)
 
     highlights_lines: List[str] = ["=== HIGHLIGHTS (Today) ==="]
     if market_reason.startswith("market_check_skipped"):
@@ -767,12 +1138,12 @@ def run_strategy(args: argparse.Namespace) -> None:
             )
 
     open_positions = [pos for pos in updated_positions.values() if pos.status == "OPEN"]
-    open_positions.sort(key=lambda p: (p.pct_since_entry or 0), reverse=True)
+    top_open = heapq.nlargest(5, open_positions, key=lambda p: (p.pct_since_entry or 0))
 
     if open_positions:
         highlights_lines.append("")
         highlights_lines.append("Open Positions (top):")
-        for pos in open_positions[:5]:
+        for pos in top_open:
             highlights_lines.append(
                 f"{pos.ticker} [{pos.strategy}] {format_float(pos.pct_since_entry)}% | R_peak {format_float(pos.r_peak)} | Held {pos.days_held}d"
             )
@@ -2,161 +2,248 @@
 """EOD publisher: run the strategy, convert CSV outputs to JSON/Markdown."""
 from __future__ import annotations
 
-import json
+import functools
+import hashlib
 import os
+import re
 import subprocess
 import sys
+import threading
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import IO, Callable, Dict, List, Optional
 
+import numpy as np
 import pandas as pd
 
+import sb_json
+from sb_io import load_highlights, read_table
+
 ROOT = Path(__file__).resolve().parent
 DATA_DIR = ROOT / "data"
 STRATEGY = ROOT / "nine_ema_dual_strategy_bot_v2.py"
-DATA_DIR.mkdir(parents=True, exist_ok=True)
 
 
+@functools.cache
+def _data_dir() -> Path:
+    """DATA_DIR, created on first use rather than at import time."""
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    return DATA_DIR
+
+
+def write_json(path: Path, payload: dict) -> None:
+    """Encode straight into the file handle; no intermediate str copy."""
+    with open(path, "wb") as handle:
+        sb_json.dump(payload, handle, indent=True)
+
 
 KEY_FILE = ROOT.parent / "API_KEYS"
+API_KEY_ENV = {
+    "polygon api key": "POLYGON_API_KEY",
+    "finnhub api key": "FINNHUB_API_KEY",
+}
+# "<provider> api key <value>" (optionally "key: value"); the value is the last token.
+API_KEY_LINE = re.compile(
+    r"^[ \t]*(" + "|".join(map(re.escape, API_KEY_ENV)) + r")\b[^\n]*?(\S+)[ \t]*$",
+    re.IGNORECASE | re.MULTILINE,
+)
 
 
 def load_local_api_keys() -> None:
     if not KEY_FILE.exists():
         return
     try:
-        lines = [line.strip() for line in KEY_FILE.read_text().splitlines() if line.strip()]
+        text = KEY_FILE.read_text()
     except Exception:
         return
-    def maybe_set(prefix: str, key: str) -> None:
-        env_name = key
-        if os.environ.get(env_name):
-            return
-        match = None
-        for line in lines:
-            lower = line.lower()
-            if lower.startswith(prefix):
-                parts = line.split()
-                if parts:
-                    match = parts[-1]
-                break
-        if match:
-            os.environ[env_name] = match
-
-    maybe_set("polygon api key", "POLYGON_API_KEY")
-    maybe_set("finnhub api key", "FINNHUB_API_KEY")
+    found: Dict[str, str] = {}
+    for match in API_KEY_LINE.finditer(text):
+        # Only the first line for each provider counts.
+        found.setdefault(API_KEY_ENV[match.group(1).lower()], match.group(2))
+    for env_name, value in found.items():
+        if not os.environ.get(env_name):
+            os.environ[env_name] = value
+
+
 def invoke_strategy() -> None:
     load_local_api_keys()
+    data_dir = _data_dir()
     cmd = [
         sys.executable,
         str(STRATEGY),
         "--ledger",
-        str(DATA_DIR / "ledger.csv"),
+        str(data_dir / "ledger.csv"),
         "--emit",
-        str(DATA_DIR / "out_signals.csv"),
+        str(data_dir / "out_signals.csv"),
         "--highlights",
-        str(DATA_DIR / "highlights.txt"),
+        str(data_dir / "highlights.txt"),
         "--tickers-file",
         str(ROOT / "watchlist.txt"),
     ]
-    print("Running screener:", " ".join(cmd))
-    subprocess.run(cmd, check=True)
+    print("Running screener:", " ".join(cmd), flush=True)
+    env = {**os.environ, "PYTHONUNBUFFERED": "1"}
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, bufsize=1, text=True, env=env)
+    # Relay the screener's output live instead of only after it exits.
+    tee = threading.Thread(target=_relay_lines, args=(proc.stdout, sys.stdout), daemon=True)
+    tee.start()
+    returncode = proc.wait()
+    tee.join()
+    if returncode:
+        raise subprocess.CalledProcessError(returncode, cmd)
 
 
-def safe_float(val):
-    if pd.isna(val):
-        return None
-    try:
-        return float(val)
-    except Exception:
-        return None
+def _relay_lines(source: IO[str], sink: IO[str]) -> None:
+    with source:
+        for line in source:
+            sink.write(line)
+            sink.flush()
+
+
+TRUE_WORDS = ("true", "1", "yes")
+FALSE_WORDS = ("false", "0", "no")
+
+
+def vec_text(col: pd.Series) -> list:
+    return col.astype("string").fillna("").tolist()
+
+
+def vec_optional_text(col: pd.Series, width: Optional[int] = None) -> list:
+    return col.astype("string").str[:width].to_numpy(dtype=object, na_value=None).tolist()
+
+
+def vec_date(col: pd.Series) -> list:
+    if not pd.api.types.is_datetime64_any_dtype(col):
+        col = pd.to_datetime(col, errors="coerce", format="ISO8601")
+    return col.dt.strftime("%Y-%m-%d").to_numpy(dtype=object, na_value=None).tolist()
+
+
+def vec_flag(col: pd.Series) -> list:
+    return col.fillna(False).astype(bool).tolist()
+
+
+def vec_float(col: pd.Series) -> list:
+    values = pd.to_numeric(col, errors="coerce").astype("float64")
+    return values.astype(object).where(values.notna(), None).tolist()
+
+
+def vec_int(col: pd.Series) -> list:
+    values = pd.to_numeric(col, errors="coerce").astype("float64")
+    values = np.trunc(values.where(np.isfinite(values))).astype("Int64")
+    return values.to_numpy(dtype=object, na_value=None).tolist()
+
+
+def vec_bool(col: pd.Series) -> list:
+    """true/1/yes and false/0/no (any case), other numbers by truthiness, else None."""
+    words = col.astype("string").str.strip().str.lower()
+    # float64, not the input's backend: on Arrow columns a coerced NaN is a
+    # valid value rather than missing, and would read as truthy.
+    numbers = pd.to_numeric(col, errors="coerce").astype("float64")
+    flags = np.select(
+        [
+            words.isin(TRUE_WORDS).to_numpy(dtype=bool, na_value=False),
+            words.isin(FALSE_WORDS).to_numpy(dtype=bool, na_value=False),
+            numbers.notna().to_numpy(),
+        ],
+        [True, False, numbers.fillna(0).ne(0).to_numpy()],
+        default=None,
+    )
+    return flags.tolist()
+
+
+# Output field -> column converter, in the order the JSON records use.
+SIGNAL_FIELDS: Dict[str, Callable[[pd.Series], list]] = {
+    "date": vec_text,
+    "ticker": vec_text,
+    "strategy": vec_text,
+    "setup": vec_flag,
+    "action": vec_text,
+    "buy_zone_low": vec_float,
+    "buy_zone_high": vec_float,
+    "confirm_today": vec_flag,
+    "close": vec_float,
+    "ema9": vec_float,
+    "ema20": vec_float,
+    "atr14": vec_float,
+    "vol": vec_int,
+    "vol20": vec_int,
+    "notes": vec_text,
+    "market_ok": vec_bool,
+    "market_reason": vec_text,
+    "next_earnings": vec_optional_text,
+}
+
+SIGNAL_COLS = list(SIGNAL_FIELDS)
+SIGNAL_DTYPES = {
+    "date": "string",
+    "ticker": "string",
+    "strategy": "string",
+    "setup": "boolean",
+    "action": "string",
+    "buy_zone_low": "float64",
+    "buy_zone_high": "float64",
+    "confirm_today": "boolean",
+    "close": "float64",
+    "ema9": "float64",
+    "ema20": "float64",
+    "atr14": "float64",
+    "vol": "float64",
+    "vol20": "float64",
+    "notes": "string",
+    "market_ok": "string",
+    "market_reason": "string",
+    "next_earnings": "string",
+}
+
+LEDGER_DATE_COLUMNS = ["entry_date", "exit_date"]
+
+LEDGER_FIELDS: Dict[str, Callable[[pd.Series], list]] = {
+    "ticker": vec_text,
+    "strategy": vec_text,
+    "status": vec_text,
+    "entry_date": vec_date,
+    "entry_price": vec_float,
+    "exit_date": vec_date,
+    "exit_price": vec_float,
+    "pct_since_entry": vec_float,
+    "r_peak": vec_float,
+    "days_held": vec_int,
+    "highest_close": vec_float,
+    "notes": vec_text,
+}
+
+
+LEDGER_COLS = list(LEDGER_FIELDS)
+LEDGER_DTYPES = {
+    "ticker": "string",
+    "strategy": "string",
+    "status": "string",
+    "entry_price": "float64",
+    "exit_price": "float64",
+    "pct_since_entry": "float64",
+    "r_peak": "float64",
+    "days_held": "float64",
+    "highest_close": "float64",
+    "notes": "string",
+}
+
+
+def frame_records(df: pd.DataFrame, fields: Dict[str, Callable[[pd.Series], list]]) -> List[dict]:
+    """Convert each column once, then let pandas emit the records."""
+    df = df.reindex(columns=list(fields))
+    clean = pd.DataFrame({name: convert(df[name]) for name, convert in fields.items()}, dtype=object)
+    return clean.to_dict(orient="records")
 
 
-def safe_int(val):
-    if pd.isna(val):
-        return None
-    try:
-        return int(val)
-    except Exception:
-        return None
-
-
-
-
-def safe_bool(val):
-    if pd.isna(val):
-        return None
-    if isinstance(val, bool):
-        return bool(val)
-    if isinstance(val, (int, float)):
-        try:
-            return bool(int(val))
-        except Exception:
-            return None
-    if isinstance(val, str):
-        lower = val.strip().lower()
-        if lower in {"true", "1", "yes"}:
-            return True
-        if lower in {"false", "0", "no"}:
-            return False
-    return None
 def build_payload(signals_csv: Path, ledger_csv: Path) -> dict:
     signals = []
     if signals_csv.exists():
-        df = pd.read_csv(signals_csv)
-        has_market_ok = "market_ok" in df.columns
-        has_market_reason = "market_reason" in df.columns
-        has_next_earnings = "next_earnings" in df.columns
-        for _, row in df.iterrows():
-            record = {
-                "date": str(row.get("date", "")),
-                "ticker": row.get("ticker", ""),
-                "strategy": row.get("strategy", ""),
-                "setup": bool(row.get("setup", False)),
-                "action": row.get("action", ""),
-                "buy_zone_low": safe_float(row.get("buy_zone_low")),
-                "buy_zone_high": safe_float(row.get("buy_zone_high")),
-                "confirm_today": bool(row.get("confirm_today", False)),
-                "close": safe_float(row.get("close")),
-                "ema9": safe_float(row.get("ema9")),
-                "ema20": safe_float(row.get("ema20")),
-                "atr14": safe_float(row.get("atr14")),
-                "vol": safe_int(row.get("vol")),
-                "vol20": safe_int(row.get("vol20")),
-                "notes": row.get("notes", ""),
-            }
-            record["market_ok"] = safe_bool(row.get("market_ok")) if has_market_ok else None
-            if has_market_reason:
-                reason = row.get("market_reason", "")
-                record["market_reason"] = "" if pd.isna(reason) else str(reason)
-            else:
-                record["market_reason"] = ""
-            record["next_earnings"] = None
-            if has_next_earnings:
-                ne = row.get("next_earnings")
-                record["next_earnings"] = None if pd.isna(ne) else str(ne)
-            signals.append(record)
+        df = read_table(signals_csv, SIGNAL_COLS, SIGNAL_DTYPES)
+        signals = frame_records(df, SIGNAL_FIELDS)
 
     positions = []
     if ledger_csv.exists():
-        ldf = pd.read_csv(ledger_csv)
-        for _, row in ldf.iterrows():
-            positions.append(
-                {
-                    "ticker": row.get("ticker", ""),
-                    "strategy": row.get("strategy", ""),
-                    "status": row.get("status", ""),
-                    "entry_date": str(row.get("entry_date"))[:10] if not pd.isna(row.get("entry_date")) else None,
-                    "entry_price": safe_float(row.get("entry_price")),
-                    "exit_date": str(row.get("exit_date"))[:10] if not pd.isna(row.get("exit_date")) else None,
-                    "exit_price": safe_float(row.get("exit_price")),
-                    "pct_since_entry": safe_float(row.get("pct_since_entry")),
-                    "r_peak": safe_float(row.get("r_peak")),
-                    "days_held": safe_int(row.get("days_held")),
-                    "highest_close": safe_float(row.get("highest_close")),
-                    "notes": row.get("notes", ""),
-                }
-            )
+        ldf = read_table(ledger_csv, LEDGER_COLS, LEDGER_DTYPES, parse_dates=LEDGER_DATE_COLUMNS)
+        positions = frame_records(ldf, LEDGER_FIELDS)
 
     return {
         "generated_at_utc": datetime.now(timezone.utc).isoformat(timespec="seconds"),
@@ -167,20 +254,41 @@ def build_payload(signals_csv: Path, ledger_csv: Path) -> dict:
 
 
 def write_outputs(payload: dict, highlights_txt: Path) -> None:
-    json_path = DATA_DIR / "signals.json"
-    json_path.write_text(json.dumps(payload, indent=2))
+    json_path = _data_dir() / "signals.json"
+    write_json(json_path, payload)
     print(f"Wrote {json_path}")
 
-    md_path = DATA_DIR / "highlights.md"
-    if highlights_txt.exists():
-        content = highlights_txt.read_text().strip()
-    else:
+    md_path = _data_dir() / "highlights.md"
+    content = load_highlights(highlights_txt)
+    if content is None:
         content = "No highlights available."
-    md = "## Highlights (Today)\n\n```\n" + content + "\n```\n"
-    md_path.write_text(md)
+    with open(md_path, "w", encoding="utf-8") as handle:
+        handle.writelines(["## Highlights (Today)\n\n```\n", content, "\n```\n"])
     print(f"Wrote {md_path}")
 
 
+def _fingerprint(*paths: Path) -> str:
+    """Digest of the files' contents; mtimes change on every screener run."""
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes() if path.exists() else b"\0missing")
+    return digest.hexdigest()
+
+
+def outputs_current(fingerprint: str) -> bool:
+    """True when signals.json was built from inputs with this content digest."""
+    json_path = _data_dir() / "signals.json"
+    if not (_data_dir() / "highlights.md").exists():
+        return False
+    try:
+        raw = json_path.read_bytes()
+        existing = sb_json.loads(raw)
+    except Exception:
+        return False
+    return isinstance(existing, dict) and existing.get("_fingerprint") == fingerprint
+
+
 def main() -> None:
     try:
         invoke_strategy()
@@ -188,8 +296,19 @@ def main() -> None:
         print(f"Screener failed with exit code {exc.returncode}", file=sys.stderr)
         raise
 
-    payload = build_payload(DATA_DIR / "out_signals.csv", DATA_DIR / "ledger.csv")
-    write_outputs(payload, DATA_DIR / "highlights.txt")
+    data_dir = _data_dir()
+    signals_csv, ledger_csv, highlights_txt = (
+        data_dir / "out_signals.csv",
+        data_dir / "ledger.csv",
+        data_dir / "highlights.txt",
+    )
+    fingerprint = _fingerprint(signals_csv, ledger_csv, highlights_txt)
+    if outputs_current(fingerprint):
+        print("Screener outputs unchanged since signals.json was built; skipping rewrite.")
+        return
+    payload = build_payload(signals_csv, ledger_csv)
+    payload["_fingerprint"] = fingerprint
+    write_outputs(payload, highlights_txt)
 
 
 if __name__ == "__main__":
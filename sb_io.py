@@ -0,0 +1,108 @@
+"""Shared readers for the strategy's output files.
+
+The screener writes every CSV with a typed Parquet sidecar next to it
+(``out_signals.parquet``, ``ledger.parquet``). Downstream steps read the
+sidecar when it is at least as new as the CSV, and fall back to parsing the
+CSV otherwise (no pyarrow, stale or missing sidecar). ``highlights.txt`` is
+read once per modification, however many steps in the process ask for it.
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+try:
+    import pyarrow as pa  # type: ignore
+    import pyarrow.csv as pacsv  # type: ignore
+    import pyarrow.parquet as pq  # type: ignore
+except ImportError:  # pragma: no cover - parquet support is optional
+    pa = pacsv = pq = None
+
+# pandas dtype aliases used by callers -> Arrow types for the CSV reader.
+ARROW_TYPES = {
+    "string": "string",
+    "boolean": "bool",
+    "float64": "float64",
+    "Int64": "int64",
+}
+
+
+def parquet_sibling(path: Path) -> Path:
+    return path.with_suffix(".parquet")
+
+
+def _fresh_sidecar(path: Path) -> Optional[Path]:
+    sidecar = parquet_sibling(path)
+    if pq is None or not sidecar.exists():
+        return None
+    if path.exists() and sidecar.stat().st_mtime_ns < path.stat().st_mtime_ns:
+        return None
+    return sidecar
+
+
+def read_table(
+    path: Path,
+    columns: List[str],
+    dtypes: Dict[str, str],
+    parse_dates: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """Load ``columns`` (those present) from the sidecar or the CSV at ``path``."""
+    sidecar = _fresh_sidecar(path)
+    if sidecar is not None:
+        try:
+            present = set(pq.read_schema(sidecar).names)
+            df = pd.read_parquet(sidecar, columns=[c for c in columns if c in present])
+            return df.astype({c: t for c, t in dtypes.items() if c in df.columns})
+        except Exception:
+            pass
+    if pacsv is not None:
+        try:
+            return _read_csv_arrow(path, columns, dtypes, parse_dates or [])
+        except Exception:
+            pass
+    return pd.read_csv(
+        path,
+        usecols=lambda c: c in columns,
+        dtype=dtypes,
+        parse_dates=parse_dates,
+        na_values=[""],
+        keep_default_na=False,
+    )
+
+
+def _read_csv_arrow(
+    path: Path, columns: List[str], dtypes: Dict[str, str], parse_dates: List[str]
+) -> pd.DataFrame:
+    """Arrow's multithreaded CSV parser; absent columns come back as nulls.
+
+    Only empty cells are missing, matching the ledger reader, so text such as
+    ticker ``NA`` or a ``N/A`` note survives.
+    """
+    column_types = {c: pa.type_for_alias(ARROW_TYPES[t]) for c, t in dtypes.items() if t in ARROW_TYPES}
+    column_types.update({c: pa.timestamp("s") for c in parse_dates})
+    options = pacsv.ConvertOptions(
+        include_columns=columns,
+        include_missing_columns=True,
+        column_types=column_types,
+        null_values=[""],
+        strings_can_be_null=True,
+    )
+    table = pacsv.read_csv(path, convert_options=options)
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+
+@lru_cache(maxsize=4)
+def _read_highlights(path: str, mtime_ns: int) -> str:
+    return Path(path).read_text(encoding="utf-8").strip()
+
+
+def load_highlights(path: Path) -> Optional[str]:
+    """Stripped highlights text, or None when the file has not been written."""
+    try:
+        mtime_ns = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    return _read_highlights(str(path), mtime_ns)
@@ -0,0 +1,52 @@
+"""JSON encode/decode shim: orjson, then ujson, then the standard library.
+
+Everything here speaks bytes so the orjson path never round-trips through
+``str``. ``BACKEND`` names the library that was picked up.
+"""
+from __future__ import annotations
+
+import json
+from typing import IO, Any, Union
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+try:
+    import ujson  # type: ignore
+except ImportError:  # pragma: no cover - ujson is an optional fallback
+    ujson = None
+
+if orjson is not None:
+    BACKEND = "orjson"
+elif ujson is not None:
+    BACKEND = "ujson"
+else:
+    BACKEND = "json"
+
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option)
+    if ujson is not None:
+        return ujson.dumps(obj, indent=2 if indent else 0, escape_forward_slashes=False).encode()
+    return json.dumps(obj, indent=2 if indent else None).encode()
+
+
+def dump(obj: Any, handle: IO[bytes], indent: bool = False) -> None:
+    """Write ``obj`` to a binary handle; the stdlib path encodes chunk by chunk."""
+    if orjson is not None or ujson is not None:
+        handle.write(dumps(obj, indent=indent))
+        return
+    for chunk in json.JSONEncoder(indent=2 if indent else None).iterencode(obj):
+        handle.write(chunk.encode())
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    if ujson is not None:
+        return ujson.loads(data)
+    return json.loads(data)
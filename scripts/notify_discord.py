@@ -1,8 +1,9 @@
 #!/usr/bin/env python3
 """Send SwingBot highlights to Discord webhooks.
 
-Reads data/highlights.txt and data/out_signals.csv, builds a rich embed, and
-POSTs to any webhooks provided via environment variables:
+Reads data/highlights.txt and data/out_signals.csv (or its Parquet sidecar),
+builds a rich embed, and POSTs to any webhooks provided via environment
+variables:
   - DISCORD_WEBHOOK_SWINGBOT
   - DISCORD_WEBHOOK_SWINGBOT_2
 
@@ -10,32 +11,58 @@ Gracefully skips if no webhook is configured.
 """
 from __future__ import annotations
 
-import json
+import gzip
 import os
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import List
 
+import numpy as np
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import sb_json  # noqa: E402
+from sb_io import load_highlights as read_highlights, read_table  # noqa: E402
+
 DATA_DIR = ROOT / "data"
 HIGHLIGHTS_PATH = DATA_DIR / "highlights.txt"
 SIGNALS_PATH = DATA_DIR / "out_signals.csv"
 
-ENTRY_ACTIONS = {"BUY_ZONE_TRIGGERED", "EARNINGS_GUARD_ACTIVE", "CONFIRM_BREAKOUT_ENTRY"}
+ENTRY_ACTIONS = frozenset({"BUY_ZONE_TRIGGERED", "EARNINGS_GUARD_ACTIVE", "CONFIRM_BREAKOUT_ENTRY"})
+SIGNAL_COLS = ["ticker", "strategy", "action", "close", "buy_zone_low", "buy_zone_high", "next_earnings"]
+SIGNAL_DTYPES = {
+    "ticker": "string",
+    "strategy": "string",
+    "action": "string",
+    "close": "float64",
+    "buy_zone_low": "float64",
+    "buy_zone_high": "float64",
+    "next_earnings": "string",
+}
 WEBHOOK_CONFIG = [
     ("DISCORD_WEBHOOK_SWINGBOT", "SwingBot"),
     ("DISCORD_WEBHOOK_SWINGBOT_2", "SwingBot_2"),
 ]
+# Opt-in: Discord does not document gzip request bodies, and a refused body
+# costs a second round trip.
+GZIP_ENV = "DISCORD_WEBHOOK_GZIP"
+
+_THREAD_LOCAL = threading.local()
 
 
 def load_highlights() -> str:
-    if not HIGHLIGHTS_PATH.exists():
+    text = read_highlights(HIGHLIGHTS_PATH)
+    if text is None:
         return "No highlights generated."
-    text = HIGHLIGHTS_PATH.read_text().strip()
     # Clip to Discord description limit (4096).
     return text[:4000]
 
@@ -43,25 +70,39 @@ def load_highlights() -> str:
 def load_entry_fields() -> List[dict]:
     if not SIGNALS_PATH.exists():
         return []
-    df = pd.read_csv(SIGNALS_PATH)
+    df = read_table(SIGNALS_PATH, SIGNAL_COLS, SIGNAL_DTYPES)
     if df.empty:
         return []
-    entries = df[df["action"].isin(ENTRY_ACTIONS)]
+    # Compare integer category codes rather than strings across the column.
+    actions = df["action"].astype("category")
+    wanted = [code for code, action in enumerate(actions.cat.categories) if action in ENTRY_ACTIONS]
+    entries = df[np.isin(actions.cat.codes.to_numpy(), wanted)]
     if entries.empty:
         entries = df.head(3)
-    fields: List[dict] = []
-    for _, row in entries.iterrows():
-        name = f"{row['ticker']} — {row['strategy']}"
-        parts = [f"Action: {row['action']}"]
-        if not pd.isna(row.get("close")):
-            parts.append(f"Close: {row['close']:.2f}")
-        if not pd.isna(row.get("buy_zone_low")) and not pd.isna(row.get("buy_zone_high")):
-            parts.append(f"Buy: {row['buy_zone_low']:.2f}-{row['buy_zone_high']:.2f}")
-        if isinstance(row.get("next_earnings"), str) and row["next_earnings"]:
-            parts.append(f"Next earnings: {row['next_earnings']}")
-        value = " | ".join(parts)
-        fields.append({"name": name, "value": value, "inline": False})
-    return fields[:5]
+    entries = entries.head(5)
+
+    # Each embed line part is built for the whole column; missing parts are None.
+    fmt = "{:.2f}".format
+    close, low, high = entries["close"], entries["buy_zone_low"], entries["buy_zone_high"]
+    earnings = entries.get("next_earnings", pd.Series(pd.NA, index=entries.index, dtype="string"))
+    lines = pd.DataFrame(
+        {
+            "name": entries["ticker"].fillna("") + " — " + entries["strategy"].fillna(""),
+            "action": "Action: " + entries["action"].fillna(""),
+            "close": ("Close: " + close.map(fmt)).where(close.notna()),
+            "buy": ("Buy: " + low.map(fmt) + "-" + high.map(fmt)).where(low.notna() & high.notna()),
+            "earnings": ("Next earnings: " + earnings.astype("string")).where(earnings.notna() & (earnings != "")),
+        }
+    ).astype(object)
+    lines = lines.where(lines.notna(), None)
+    return [
+        {
+            "name": row.name,
+            "value": " | ".join(p for p in (row.action, row.close, row.buy, row.earnings) if p),
+            "inline": False,
+        }
+        for row in lines.itertuples(index=False)
+    ]
 
 
 def build_embed() -> dict:
@@ -77,29 +118,82 @@ def build_embed() -> dict:
     return embed
 
 
-def post_webhook(url: str, payload: dict) -> None:
-    headers = {"Content-Type": "application/json"}
-    response = requests.post(url, headers=headers, data=json.dumps(payload), timeout=10)
+def webhook_session() -> requests.Session:
+    """Per-thread keep-alive session for webhook posts.
+
+    requests does not guarantee Session thread safety, so each posting worker
+    gets its own, as the screener's provider sessions do. Webhook posts are not
+    idempotent, so only requests Discord never acted on are retried: 429
+    (honouring Retry-After) and failed connections. 5xx and read errors are
+    not retried, to avoid duplicate embeds.
+    """
+    session = getattr(_THREAD_LOCAL, "session", None)
+    if session is None:
+        session = requests.Session()
+        session.headers["Content-Type"] = "application/json"
+        retry = Retry(
+            total=3,
+            read=0,
+            backoff_factor=0.3,
+            status_forcelist=[429],
+            allowed_methods=frozenset({"POST"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=retry)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        _THREAD_LOCAL.session = session
+    return session
+
+
+def post_webhook(url: str, payload: dict, compress: bool = False) -> None:
+    """POST ``payload``; with ``compress`` the body is gzipped, resent plain if refused."""
+    session = webhook_session()
+    body = sb_json.dumps(payload)
+    if compress:
+        response = session.post(
+            url,
+            data=gzip.compress(body, compresslevel=1),
+            headers={"Content-Encoding": "gzip"},
+            timeout=10,
+        )
+        if response.status_code in (400, 415):
+            # Endpoint would not take a compressed body; resend it plain.
+            response = session.post(url, data=body, timeout=10)
+    else:
+        response = session.post(url, data=body, timeout=10)
     if response.status_code >= 400:
         raise RuntimeError(f"Discord webhook failed ({response.status_code}): {response.text[:200]}")
 
 
 def main() -> None:
     embed = build_embed()
-    posted = False
+    compress = os.getenv(GZIP_ENV, "").strip().lower() in {"1", "true", "yes"}
+    targets = []
     seen_urls = set()
     for env_var, username in WEBHOOK_CONFIG:
         url = os.getenv(env_var)
         if not url or url in seen_urls:
             continue
         seen_urls.add(url)
-        payload = {"username": username, "embeds": [embed]}
-        try:
-            post_webhook(url, payload)
-            print(f"Sent highlights to Discord webhook ({env_var}): {url[-20:]}")
-            posted = True
-        except Exception as exc:
-            print(f"Warning: failed to post to Discord webhook {env_var}: {exc}", file=sys.stderr)
+        targets.append((env_var, url, {"username": username, "embeds": [embed]}))
+
+    posted = False
+    if targets:
+        # Webhooks are independent; post them concurrently.
+        with ThreadPoolExecutor(max_workers=len(targets)) as executor:
+            futures = {
+                executor.submit(post_webhook, url, payload, compress): (env_var, url)
+                for env_var, url, payload in targets
+            }
+            for future in as_completed(futures):
+                env_var, url = futures[future]
+                try:
+                    future.result()
+                    print(f"Sent highlights to Discord webhook ({env_var}): {url[-20:]}")
+                    posted = True
+                except Exception as exc:
+                    print(f"Warning: failed to post to Discord webhook {env_var}: {exc}", file=sys.stderr)
     if not posted:
         print("No Discord webhooks configured; skipping notification.")
 